@@ -8,87 +8,176 @@
 # 1. Make sure you have Python installed on your system.
 # 2. Install the 'requests' library by opening your terminal or command prompt and running:
 #    pip install requests
+#    Optionally also install 'orjson' for faster parsing of API responses:
+#    pip install orjson
 # 3. Save this script as a file (e.g., danbooru_tag_generator_ui.py).
 # 4. Run the script from your terminal with:
 #    python danbooru_tag_generator_ui.py
 
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import math
+import queue
 import random
+import sys
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
 
+try:
+    # orjson is optional; it decodes the API responses noticeably faster.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# --- HTTP Session ---
+
+# A single session is shared across all requests so the TCP/TLS connection to
+# Danbooru is kept alive and reused instead of being re-established every call.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+_SESSION.headers.update({'User-Agent': 'Danbooru-Random-Tag-Generator-UI/2.2'})
+
 # --- Core API Logic ---
 
+# Rough number of unique tags a single 100-post page contributes. Used to decide
+# how many pages to request in parallel.
+AVG_TAGS_PER_REQUEST = 500
+
+# Upper bound on page requests per generation, which also caps how many fetch
+# threads run at once. Safety break to prevent infinite loops.
+MAX_REQUESTS = 10
+
+def _fetch_page(api_url):
+    """
+    Fetches a single page of posts and extracts their tags. Runs on a worker
+    thread, so parsing one page overlaps with the other requests still in flight.
+    Returns a tuple: (post_ids, page_tags, page_artist_tags), where the last two
+    hold one list of tags per post.
+    """
+    response = _SESSION.get(api_url, timeout=(3.05, 15))
+    response.raise_for_status()
+    posts = _json_loads(response.content)
+
+    post_ids = []
+    page_tags = []
+    page_artist_tags = []
+    for post in posts:
+        if 'id' in post:
+            post_ids.append(post['id'])
+
+        # Danbooru API conveniently splits tags by category in post objects
+        # Categories: 0=general, 1=artist, 3=copyright, 4=character, 5=meta
+        # The non-artist categories are joined first so they are split in one pass.
+        combined = ' '.join((
+            post.get('tag_string_general', ''),
+            post.get('tag_string_copyright', ''),
+            post.get('tag_string_character', ''),
+            post.get('tag_string_meta', ''),
+        ))
+        # Tags are interned so the same tag repeated across a page's posts is stored once.
+        page_tags.append(list(map(sys.intern, combined.split())))
+        page_artist_tags.append(list(map(sys.intern, post.get('tag_string_artist', '').split())))
+
+    return post_ids, page_tags, page_artist_tags
+
+def _fetch_page_into(api_url, results):
+    """Runs _fetch_page, putting its result or the error it raised on the results queue."""
+    try:
+        results.put(_fetch_page(api_url))
+    except Exception as e:
+        results.put(e)
+
 def fetch_tags(count):
     """
     Fetches a specified number of random tags from the Danbooru API by
     sampling tags from random posts, bypassing the 1000-page limit.
-    This version prepends 'artist: ' to all artist tags and tracks source posts.
-    Returns a tuple: (list_of_tags, list_of_post_urls, full_tag_pool, status_message)
+    This version prepends 'artist: ' to all artist tags and tracks source posts by id.
+    Tags are returned in display form, with underscores replaced by spaces.
+    Returns a tuple: (list_of_tags, list_of_post_ids, full_tag_pool, status_message)
+    where full_tag_pool is already sorted for display.
     """
     # Using sets to automatically handle duplicates
     collected_tags = set()
     collected_artist_tags = set()
-    source_post_urls = set()
+    source_post_ids = set()
     
     # We need to fetch enough posts to get a good variety of unique tags.
     # Let's aim to collect at least 3 times the needed tags as candidates.
     needed_candidates = count * 3 + 20 # Add a buffer
-    max_requests = 10 # Safety break to prevent infinite loops
     requests_made = 0
 
-    while len(collected_tags) + len(collected_artist_tags) < needed_candidates and requests_made < max_requests:
-        # This endpoint respects the 'random=true' parameter, allowing a true random sample.
-        api_url = f"https://danbooru.donmai.us/posts.json?limit=100&random=true"
-        requests_made += 1
-        
+    # This endpoint respects the 'random=true' parameter, allowing a true random sample.
+    # 'only=' restricts each post to the fields we actually read, shrinking the response.
+    api_url = (
+        "https://danbooru.donmai.us/posts.json?limit=100&random=true"
+        "&only=id,tag_string_general,tag_string_artist,tag_string_copyright,tag_string_character,tag_string_meta"
+    )
+
+    while len(collected_tags) + len(collected_artist_tags) < needed_candidates and requests_made < MAX_REQUESTS:
+        # Estimate how many pages are still needed and request them all at once,
+        # since each random page is independent of the others.
+        shortfall = needed_candidates - (len(collected_tags) + len(collected_artist_tags))
+        n_parallel = min(MAX_REQUESTS - requests_made, math.ceil(shortfall / AVG_TAGS_PER_REQUEST))
+        requests_made += n_parallel
+
+        # Daemon threads, like the main fetch thread, so closing the window never
+        # waits on a request that is still in flight.
+        results = queue.Queue()
+        for _ in range(n_parallel):
+            threading.Thread(target=_fetch_page_into, args=(api_url, results), daemon=True).start()
+
         try:
-            headers = {'User-Agent': 'Danbooru-Random-Tag-Generator-UI/2.2'}
-            response = requests.get(api_url, headers=headers, timeout=15)
-            response.raise_for_status()
-            posts = response.json()
-            
-            if not posts:
-                continue
-
-            for post in posts:
-                # Add the post's URL to our sources set
-                if 'id' in post:
-                    source_post_urls.add(f"https://danbooru.donmai.us/posts/{post['id']}")
-
-                # Danbooru API conveniently splits tags by category in post objects
-                # Categories: 0=general, 1=artist, 3=copyright, 4=character, 5=meta
-                general_tags = post.get('tag_string_general', '').split()
-                copyright_tags = post.get('tag_string_copyright', '').split()
-                character_tags = post.get('tag_string_character', '').split()
-                meta_tags = post.get('tag_string_meta', '').split()
-                
-                collected_tags.update(general_tags)
-                collected_tags.update(copyright_tags)
-                collected_tags.update(character_tags)
-                collected_tags.update(meta_tags)
-                
-                # Add artist tags to a separate set to be formatted later
-                artist_tags = post.get('tag_string_artist', '').split()
-                collected_artist_tags.update(artist_tags)
-                                
-        except requests.exceptions.RequestException as e:
-            # If the API fails, stop and inform the user.
+            for _ in range(n_parallel):
+                result = results.get()
+                if isinstance(result, Exception):
+                    raise result
+                post_ids, page_tags, page_artist_tags = result
+
+                # Add the posts' ids to our sources set
+                source_post_ids.update(post_ids)
+
+                # Merge the whole page in one call per set instead of once per post.
+                collected_tags.update(*page_tags)
+                # Artist tags go to a separate set to be formatted later
+                collected_artist_tags.update(*page_artist_tags)
+
+                # Stop early once we have enough candidates. The rest of this batch
+                # is already in flight; those threads finish in the background and
+                # their results are dropped with the queue. The batch size estimate
+                # above is what keeps surplus requests low.
+                if len(collected_tags) + len(collected_artist_tags) >= needed_candidates:
+                    break
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # If the API fails or returns something that isn't JSON (e.g. a
+            # maintenance page), stop and inform the user.
             return [], [], [], f"Error: Failed to fetch posts from Danbooru. {e}"
 
-    # Combine the collected tags, formatting artist tags appropriately.
-    final_pool = list(collected_tags) + [f"artist: {tag}" for tag in collected_artist_tags]
-    
+    # Combine the collected tags in their display form (underscores become spaces),
+    # formatting artist tags appropriately. The UI shows them as-is.
+    final_pool = {tag.replace('_', ' ') for tag in collected_tags}
+    final_pool.update(f"artist: {tag.replace('_', ' ')}" for tag in collected_artist_tags)
+
+    # Sort here, on the worker thread, so the UI thread only has to display the pool.
+    sorted_pool = sorted(final_pool)
+
     if len(final_pool) < count:
         # Not enough unique tags were found, so return everything we have.
-        random.shuffle(final_pool)
-        return final_pool, list(source_post_urls), final_pool, f"Warning: Found only {len(final_pool)} unique tags. Returning all."
+        all_tags = list(final_pool)
+        random.shuffle(all_tags)
+        return all_tags, list(source_post_ids), sorted_pool, f"Warning: Found only {len(final_pool)} unique tags. Returning all."
 
     # Randomly select the requested number of tags from the final pool.
-    selected_tags = random.sample(final_pool, count)
+    selected_tags = random.sample(sorted_pool, count)
     
-    return selected_tags, list(source_post_urls), final_pool, f"Success! Generated {len(selected_tags)} tags from random posts."
+    return selected_tags, list(source_post_ids), sorted_pool, f"Success! Generated {len(selected_tags)} tags from random posts."
 
 # --- Tkinter UI Application Class ---
 
@@ -98,7 +187,7 @@ class TagGeneratorApp:
         self.root.title("Danbooru Random Tag Generator")
         self.root.geometry("800x600")
         self.root.minsize(600, 450)
-        self.post_source_urls = []
+        self.post_source_ids = []
         self.full_tag_pool = []
 
         # --- LAYOUT MANAGEMENT ---
@@ -124,13 +213,11 @@ class TagGeneratorApp:
         
         self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(
-                scrollregion=self.canvas.bbox("all")
-            )
-        )
+        self._scrollregion_pending = False
+        self.scrollable_frame.bind("<Configure>", lambda e: self._schedule_scrollregion())
         self.canvas.bind("<Configure>", self.on_canvas_configure)
+        self._pending_scroll = 0
+        self._scroll_after = None
         self.root.bind_all("<MouseWheel>", self._on_mousewheel)
         # --- END SCROLLBAR IMPLEMENTATION ---
 
@@ -183,7 +270,7 @@ class TagGeneratorApp:
         paned_window.add(right_pane, weight=1)
         self.tag_pool_label_var = tk.StringVar(value="Full Tag Pool")
         ttk.Label(right_pane, textvariable=self.tag_pool_label_var).pack(anchor='w')
-        self.tag_pool_text = scrolledtext.ScrolledText(right_pane, wrap=tk.WORD, height=10, state='disabled', font=('Helvetica', 10))
+        self.tag_pool_text = scrolledtext.ScrolledText(right_pane, wrap=tk.WORD, height=10, state='disabled', undo=False, font=('Helvetica', 10))
         self.tag_pool_text.pack(fill=tk.BOTH, expand=True)
         
         # Save buttons frame
@@ -204,6 +291,19 @@ class TagGeneratorApp:
         """Resizes the inner frame to match the canvas width."""
         self.canvas.itemconfig(self.canvas_window, width=event.width)
 
+    def _schedule_scrollregion(self):
+        """Coalesces scrollregion updates from bursts of <Configure> events into one idle callback."""
+        if not self._scrollregion_pending:
+            self._scrollregion_pending = True
+            self.root.after_idle(self._update_scrollregion)
+
+    def _update_scrollregion(self):
+        """Sizes the canvas scrollregion to the inner frame, its only item."""
+        self._scrollregion_pending = False
+        self.canvas.configure(scrollregion=(
+            0, 0, self.scrollable_frame.winfo_reqwidth(), self.scrollable_frame.winfo_reqheight()
+        ))
+
     def _on_mousewheel(self, event):
         """Handles mouse wheel scrolling for Windows, MacOS, and Linux."""
         # The delta value differs by OS, this logic handles them.
@@ -213,8 +313,24 @@ class TagGeneratorApp:
             delta = -1
         else:
             delta = -1 * (event.delta // 120) # For high-precision mice
-            
-        self.canvas.yview_scroll(delta, "units")
+
+        # Coalesce bursts of wheel events into at most one scroll per ~16 ms.
+        self._pending_scroll += delta
+        if self._scroll_after is None:
+            self._scroll_after = self.root.after(16, self._flush_scroll)
+
+    def _flush_scroll(self):
+        """Applies the scroll distance accumulated by _on_mousewheel."""
+        self._scroll_after = None
+        if self._pending_scroll:
+            self.canvas.yview_scroll(self._pending_scroll, "units")
+            self._pending_scroll = 0
+
+    def _set_text(self, widget, text):
+        """Replaces the contents of a read-only text widget in a single call."""
+        widget.config(state='normal')
+        widget.replace('1.0', tk.END, text)
+        widget.config(state='disabled')
 
     def create_input_field(self, label_text, row):
         """Helper to create a label and entry widget."""
@@ -241,14 +357,10 @@ class TagGeneratorApp:
         self.save_sources_button.config(state='disabled')
         
         # Clear previous data and UI elements
-        self.post_source_urls = [] 
+        self.post_source_ids = [] 
         self.full_tag_pool = []
-        self.results_text.config(state='normal')
-        self.results_text.delete('1.0', tk.END)
-        self.results_text.config(state='disabled')
-        self.tag_pool_text.config(state='normal')
-        self.tag_pool_text.delete('1.0', tk.END)
-        self.tag_pool_text.config(state='disabled')
+        self._set_text(self.results_text, "")
+        self._set_text(self.tag_pool_text, "")
         self.tag_pool_label_var.set("Full Tag Pool")
 
         self.update_status("Validating input...")
@@ -280,8 +392,8 @@ class TagGeneratorApp:
     def run_fetch_logic(self, count):
         """The actual logic that runs in the background."""
         self.update_status("Fetching tags from random posts...")
-        tags, post_urls, full_pool, message = fetch_tags(count)
-        self.post_source_urls = post_urls
+        tags, post_ids, full_pool, message = fetch_tags(count)
+        self.post_source_ids = post_ids
         self.full_tag_pool = full_pool
         
         # Update UI with final result
@@ -292,30 +404,27 @@ class TagGeneratorApp:
         self.status_var.set(message)
         
         # --- Update Generated Tags Box ---
-        self.results_text.config(state='normal')
-        self.results_text.delete('1.0', tk.END)
         if tags is not None and tags:
-            formatted_tags = [tag.replace('_', ' ') for tag in tags]
-            self.results_text.insert(tk.END, ", ".join(formatted_tags))
+            self._set_text(self.results_text, ", ".join(tags))
             self.save_tags_button.config(state='normal')
-        self.results_text.config(state='disabled')
+        else:
+            self._set_text(self.results_text, "")
         
         # --- Update Full Tag Pool Box ---
-        self.tag_pool_text.config(state='normal')
-        self.tag_pool_text.delete('1.0', tk.END)
         if self.full_tag_pool:
             self.tag_pool_label_var.set(f"Full Tag Pool ({len(self.full_tag_pool)} tags)")
-            formatted_pool = sorted([tag.replace('_', ' ') for tag in self.full_tag_pool])
-            self.tag_pool_text.insert(tk.END, "\n".join(formatted_pool))
+            self._set_text(self.tag_pool_text, "\n".join(self.full_tag_pool))
         else:
             self.tag_pool_label_var.set("Full Tag Pool")
-        self.tag_pool_text.config(state='disabled')
+            self._set_text(self.tag_pool_text, "")
 
         # --- Update Buttons ---
-        if self.post_source_urls:
+        if self.post_source_ids:
             self.save_sources_button.config(state='normal')
         self.generate_button.config(state='normal')
 
+        self._schedule_scrollregion()
+
     def save_tags_file(self):
         """Opens a save dialog and saves the generated tags to a text file."""
         content = self.results_text.get('1.0', tk.END).strip()
@@ -338,7 +447,7 @@ class TagGeneratorApp:
                 
     def save_post_sources(self):
         """Saves the list of source post URLs to a text file."""
-        if not self.post_source_urls:
+        if not self.post_source_ids:
             messagebox.showwarning("Warning", "There are no post sources to save.")
             return
 
@@ -350,7 +459,8 @@ class TagGeneratorApp:
         if filepath:
             try:
                 with open(filepath, "w", encoding="utf-8") as f:
-                    f.write("\n".join(sorted(self.post_source_urls)))
+                    # Ids are kept as ints and only turned into URLs here, after sorting.
+                    f.write("\n".join(f"https://danbooru.donmai.us/posts/{post_id}" for post_id in sorted(self.post_source_ids)))
                 self.update_status(f"Post sources saved to {filepath}")
             except IOError as e:
                 messagebox.showerror("Save Error", f"Could not save file. Reason: {e}")